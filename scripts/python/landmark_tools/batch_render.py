@@ -1,11 +1,11 @@
 #!/usr/bin/env python3
- 
+
 # #
 #  \file   `batch_render.py`
 #  \author Cecilia Mauceri
 #  \brief  This script is used to render a batch of different sun angles with blender
-#  Usage: python3 batch_render.py file angle_csv -height HEIGHT -width WIDTH [--save-blend-file]
-#  
+#  Usage: python3 batch_render.py file angle_csv -height HEIGHT -width WIDTH [--save-blend-file] [--num-workers K]
+#
 #  Copyright 2024 California Institute of Technology
 #
 #  Licensed under the Apache License, Version 2.0 (the "License");
@@ -22,25 +22,17 @@
 
 
 import argparse
-import bpy
-import csv
-import render_ply
+import multiprocessing
+import os
 
-if __name__ == "__main__":
+import numpy as np
 
-    parser = argparse.ArgumentParser(description="Render a batch of different sun angles with blender")
-    parser.add_argument("file", type=str, help="plyfile defining a DEM mesh in a local reference frame OR a blend file from a previous run")
-    parser.add_argument("angle_csv", type=str, help="CSV file containing one line per desired sun angle. Line format is <timestamp, elevation_in_degrees, azimuth_in_degrees>")
-    parser.add_argument("-height", type=int, required=True, help="height of output image in pixels. ")
-    parser.add_argument("-width", type=int, required=True, help="width of output image in pixels")
-    parser.add_argument("-resolution", type=float, required=True, help="resolution in meters/pixel of output image")
-    parser.add_argument(
-        "--save-blend-file",
-        action="store_true",
-        help="Save a new blend file for additional renders. This option is recommended to accelerate additional renders.",
-    )
 
-    args = parser.parse_args()
+def load_scene(args):
+    """Load the scene from a .ply or .blend file into the current Blender session."""
+    import bpy
+    import render_ply
+
     if(args.file.endswith(".ply")):
         render_ply.configure_scene(
             args.file,
@@ -55,15 +47,68 @@ if __name__ == "__main__":
         print(f"File type not supported: {args.file}, must be a .ply or .blend file")
         exit(1)
 
-    with open(args.angle_csv, newline='') as csvfile:
-        angle_reader = csv.reader(csvfile, delimiter=',')
-        for row in angle_reader:
-            sun_elevation = float(row[1])
-            sun_azimuth = float(row[2])
-            output_file = "{}_{:0.3f}e_{:0.3f}a.png".format(args.file.replace(".blend", ""), sun_elevation, sun_azimuth)
-
-            render_ply.render_sun_angle(
-                sun_elevation,
-                sun_azimuth,
-                output_file
-            )
\ No newline at end of file
+
+def render_rows(rows, args):
+    """Render one sun-angle row after another, reusing the loaded scene."""
+    import render_ply
+
+    load_scene(args)
+
+    for row in rows:
+        sun_elevation = float(row['elev'])
+        sun_azimuth = float(row['az'])
+        output_file = "{}_{:0.3f}e_{:0.3f}a.png".format(args.file.replace(".blend", ""), sun_elevation, sun_azimuth)
+
+        render_ply.render_sun_angle(
+            sun_elevation,
+            sun_azimuth,
+            output_file
+        )
+
+
+def render_worker(worker_args):
+    """Render a slice of the angle list on one GPU.
+
+    CUDA_VISIBLE_DEVICES must be set before bpy is imported, which is why the
+    bpy and render_ply imports live inside the render functions.
+    """
+    worker_index, rows, args = worker_args
+    os.environ["CUDA_VISIBLE_DEVICES"] = str(worker_index)
+    render_rows(rows, args)
+
+
+if __name__ == "__main__":
+
+    parser = argparse.ArgumentParser(description="Render a batch of different sun angles with blender")
+    parser.add_argument("file", type=str, help="plyfile defining a DEM mesh in a local reference frame OR a blend file from a previous run")
+    parser.add_argument("angle_csv", type=str, help="CSV file containing one line per desired sun angle. Line format is <timestamp, elevation_in_degrees, azimuth_in_degrees>")
+    parser.add_argument("-height", type=int, required=True, help="height of output image in pixels. ")
+    parser.add_argument("-width", type=int, required=True, help="width of output image in pixels")
+    parser.add_argument("-resolution", type=float, required=True, help="resolution in meters/pixel of output image")
+    parser.add_argument(
+        "--save-blend-file",
+        action="store_true",
+        help="Save a new blend file for additional renders. This option is recommended to accelerate additional renders.",
+    )
+    parser.add_argument(
+        "--num-workers",
+        type=int,
+        default=1,
+        help="Number of render worker processes. Each worker is pinned to one GPU through CUDA_VISIBLE_DEVICES.",
+    )
+
+    args = parser.parse_args()
+
+    rows = np.atleast_1d(np.loadtxt(
+        args.angle_csv, delimiter=',', usecols=(0, 1, 2),
+        dtype=[('ts', 'U32'), ('elev', 'f8'), ('az', 'f8')]))
+    # Group neighboring sun positions so successive renders reuse warm state
+    rows.sort(order=('elev', 'az'))
+
+    if args.num_workers <= 1:
+        render_rows(rows, args)
+    else:
+        chunks = [(idx, rows[idx::args.num_workers], args) for idx in range(args.num_workers)]
+        # Spawn so each worker imports bpy fresh after its GPU is pinned
+        with multiprocessing.get_context("spawn").Pool(args.num_workers) as pool:
+            pool.map(render_worker, chunks)
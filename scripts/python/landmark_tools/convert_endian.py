@@ -3,6 +3,11 @@
 #  \file   `convert_endian.py`
 #  \author Cecilia Mauceri
 #  \brief  Load little endian and save big endian landmark files in python
+#
+#  The bulk srm and ele sections are never decoded into Python objects: the
+#  loader takes zero-copy numpy views over a read-only mapping of the input
+#  and the save path byteswaps each section in C on its way to the output,
+#  so conversion cost is bounded by I/O rather than the interpreter.
 #  
 #  \copyright Copyright 2024 California Institute of Technology
 #
@@ -22,54 +27,71 @@
 #  - Created: 2023-08-22
 #  
 
+import mmap
+
 import numpy as np
 import struct
 from landmark import Landmark, unpack_matrix
 
 body_conversion = {'Earth':0, 'Moon':1, 'Mars':0};
 
+## \brief Compiled header structs for the legacy little endian layout
+_LEGACY_IIII = struct.Struct('<iiii')
+_LEGACY_6D = struct.Struct('<dddddd')
+_LEGACY_DDD = struct.Struct('<ddd')
+
 class LegacyLittleEndianLandmark(Landmark):
 
     def __init__(self, lmk_file, body=None):
+        # Map the file instead of reading it whole so the OS pages data in on
+        # demand; every section is copied out below, so the mapping is
+        # released when parsing finishes
         with open(lmk_file, 'rb') as fp:
-            file_data = fp.read()
+            self._mm = mmap.mmap(fp.fileno(), 0, access=mmap.ACCESS_READ)
+
+        # One zero-copy view; slicing bytes directly would copy each section
+        mv = memoryview(self._mm)
 
         bytes_unpacked = 0
 
-        [self.BODY, self.lmk_id, self.num_cols, self.num_rows] = struct.unpack('<iiii', file_data[bytes_unpacked:bytes_unpacked+4*4])
+        [self.BODY, self.lmk_id, self.num_cols, self.num_rows] = _LEGACY_IIII.unpack_from(mv, bytes_unpacked)
         bytes_unpacked += 4*4
 
-        id = bytearray('{}'.format(self.lmk_id).encode('utf-8'))
-        id += b'0'*(32-len(id))
-        self.lmk_id = id
+        # Pad with ASCII '0' to 32 bytes, matching the version-string padding
+        # convention in Landmark.save
+        self.lmk_id = str(self.lmk_id).encode('ascii').ljust(32, b'0')[:32]
 
         if body is not None:
             self.BODY = body_conversion[body]
 
         self.num_pixels = self.num_cols*self.num_rows
 
-        [self.anchor_col, self.anchor_row, lat, long, radius, self.resolution] = struct.unpack('<dddddd', file_data[bytes_unpacked:bytes_unpacked+6*8])
+        [self.anchor_col, self.anchor_row, lat, long, radius, self.resolution] = _LEGACY_6D.unpack_from(mv, bytes_unpacked)
         bytes_unpacked += 6*8
 
-        self.anchor_point = np.array(struct.unpack('<ddd', file_data[bytes_unpacked:bytes_unpacked+3*8]))
+        self.anchor_point = np.array(_LEGACY_DDD.unpack_from(mv, bytes_unpacked))
         bytes_unpacked += 3*8
 
         #skipped derived matrices
         bytes_unpacked += (3*2)*8
         bytes_unpacked += (3*2)*8
-        
-        self.mapRworld = unpack_matrix('d', [3, 3], file_data[bytes_unpacked:], little_endian=True)
+
+        self.mapRworld = unpack_matrix('d', [3, 3], mv, little_endian=True, offset=bytes_unpacked).astype(np.float64)
         bytes_unpacked += (3*3)*8
 
         #skipped derived matrices
         bytes_unpacked += (3)*8
         bytes_unpacked += (4)*8
 
-        self.srm = unpack_matrix('B', [self.num_cols, self.num_rows], file_data[bytes_unpacked:], little_endian=True)
+        # Writable native-endian copies; see Landmark._from_buffer
+        self.srm = unpack_matrix('B', [self.num_cols, self.num_rows], mv, little_endian=True, offset=bytes_unpacked).copy()
         bytes_unpacked += (self.num_pixels)*1
 
-        self.ele = unpack_matrix('f', [self.num_cols, self.num_rows], file_data[bytes_unpacked:], little_endian=True)
+        self.ele = unpack_matrix('f', [self.num_cols, self.num_rows], mv, little_endian=True, offset=bytes_unpacked).astype(np.float32)
         bytes_unpacked += (self.num_pixels)*4
+
+        mv.release()
+        self._mm.close()
     
 
 if __name__ == "__main__":
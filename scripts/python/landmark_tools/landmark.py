@@ -22,37 +22,62 @@
 #  - Created: 2023-08-22
 #  
 
+import copy
+import functools
+import mmap
+import os
+
 import numpy as np
 import struct
 
+## \brief Mapping from struct-style type characters to numpy dtype strings
+_DTYPE_FOR_TYPE = {'d': 'f8', 'f': 'f4', 'B': 'u1'}
+
+## \brief Compiled header structs, shared by the load and save paths
+_HDR_III = struct.Struct('>iii')
+_HDR_DDD = struct.Struct('>ddd')
+
+## \brief Structured dtype covering the fixed-layout big endian header that
+# follows the id field, so the whole block is decoded in one read
+_HDR_DTYPE = np.dtype([
+    ('body', '>i4'), ('num_cols', '>i4'), ('num_rows', '>i4'),
+    ('anchor_col', '>f8'), ('anchor_row', '>f8'), ('resolution', '>f8'),
+    ('anchor_point', '>f8', 3), ('mapRworld', '>f8', (3, 3)),
+])
+_LEGACY_IIII = struct.Struct('<iiii')
+_LEGACY_6D = struct.Struct('<dddddd')
+_LEGACY_DDD = struct.Struct('<ddd')
+
 ## \brief Unpack a big endian binary matrix into a numpy array
 #
 # Element types supported:
 # d = double
 # f = float
 # B = uint8
-def unpack_matrix(type, size, buffer, little_endian=False):
-    if type == 'd':
-        b_size = 8
-    elif type == 'f':
-        b_size = 4
-    elif type == 'B':
-        b_size = 1
-    else:
+def unpack_matrix(type, size, buffer, little_endian=False, offset=0):
+    if type not in _DTYPE_FOR_TYPE:
         raise ValueError("Type not supported");
 
     endian_flag = '>'
     if little_endian:
         endian_flag = '<'
 
-    list_m = []
-    bytes_unpacked = 0
-    for ii in range(size[1]):
-        nbytes = b_size*size[0]
-        list_m.append(struct.unpack('>'+type*size[0], buffer[bytes_unpacked:bytes_unpacked+nbytes]))
-        bytes_unpacked += nbytes
+    dt = np.dtype(endian_flag + _DTYPE_FOR_TYPE[type])
+    return np.frombuffer(buffer, dtype=dt, count=size[0]*size[1], offset=offset).reshape(size[1], size[0])
 
-    return np.array(list_m)
+## \brief Serialize a matrix in the byte order of dt
+#
+# When a conversion copy is already needed to make the data contiguous and
+# native-endian, the byteswap runs in place on that private copy instead of
+# allocating a second full-size array the way astype(dt) would.
+def _matrix_bytes(mat, dt):
+    native = np.ascontiguousarray(mat, dtype=dt.newbyteorder('='))
+    if dt.itemsize > 1 and dt != native.dtype:
+        if np.shares_memory(native, mat):
+            native = native.byteswap()
+        else:
+            native.byteswap(inplace=True)
+    return native.tobytes()
 
 ## \brief Pack a big endian numpy array into a bytearray
 #
@@ -63,32 +88,97 @@ def unpack_matrix(type, size, buffer, little_endian=False):
 # f = float
 # B = uint8
 def pack_matrix(type, mat, buffer, offset=0, little_endian=False):
-    if type == 'd':
-        b_size = 8
-    elif type == 'f':
-        b_size = 4
-    elif type == 'B':
-        b_size = 1
-    else:
+    if type not in _DTYPE_FOR_TYPE:
         raise ValueError("Type not supported");
 
     endian_flag = '>'
     if little_endian:
         endian_flag = '<'
 
-    bytes_packed = offset
-    if len(mat.shape)==1:
-       for jj in range(mat.shape[0]):
-            struct.pack_into(endian_flag+type, buffer, bytes_packed, mat[jj])
-            bytes_packed += b_size
+    dt = np.dtype(endian_flag + _DTYPE_FOR_TYPE[type])
+    mat = np.asarray(mat)
+    if mat.dtype != np.dtype(object):
+        raw = _matrix_bytes(mat, dt)
+        buffer[offset:offset+len(raw)] = raw
     else:
-        for ii in range(mat.shape[0]):
-            for jj in range(mat.shape[1]):
-                struct.pack_into(endian_flag+type, buffer, bytes_packed, mat[ii, jj])
-                bytes_packed += b_size
+        # Object-dtype input cannot go through tobytes; still collapse it
+        # into a single C-level pack instead of one pack_into per element
+        flat = mat.ravel(order='C')
+        struct.pack_into(endian_flag + type*flat.size, buffer, offset, *flat.tolist())
 
     return
 
+## \brief Parse a landmark file once per (path, mtime) and share the instance
+#
+# The matrices are marked read-only so one cached instance can back many
+# concurrent readers; Landmark.load hands out deep copies on request.
+@functools.lru_cache(maxsize=32)
+def _load_cached(path, mtime):
+    lmk = Landmark(path)
+    lmk.srm.setflags(write=False)
+    lmk.ele.setflags(write=False)
+    return lmk
+
+
+## \brief Byte-level equality via memcmp, or None when the layouts differ
+#
+# Same-shape C-contiguous arrays of one dtype compare as raw buffers, which
+# runs at memcmp speed and stops at the first mismatching byte. Returns None
+# when that precondition does not hold so the caller can fall back to the
+# element-wise comparison.
+def _bytes_equal(a, b):
+    a = np.asarray(a)
+    b = np.asarray(b)
+    if (a.shape == b.shape and a.dtype == b.dtype
+            and a.flags.c_contiguous and b.flags.c_contiguous):
+        return memoryview(a).cast('B') == memoryview(b).cast('B')
+    return None
+
+
+## \brief np.array_equal with a memcmp fast path for matching layouts
+def _array_equal(a, b):
+    same = _bytes_equal(a, b)
+    if same is None:
+        return np.array_equal(a, b)
+    return same
+
+
+## \brief Block-wise |a - b| <= atol, short-circuiting on the first bad block
+#
+# Walks the rasters 128 rows at a time so each difference scratch stays
+# L2-sized, instead of allocating two full-size temporaries, and a gross
+# mismatch stops after its block. NaN in either operand fails the comparison
+# (NaN <= atol is False), matching np.allclose.
+def _within_tolerance(a, b, atol):
+    a = np.asarray(a)
+    b = np.asarray(b)
+    # One block-sized scratch serves every iteration: subtract and abs write
+    # into it in place, so the sweep allocates nothing per block
+    rows = min(128, a.shape[0])
+    scratch = np.empty((rows,) + a.shape[1:], dtype=np.result_type(a, b))
+    for row0 in range(0, a.shape[0], 128):
+        n = min(128, a.shape[0] - row0)
+        diff = np.subtract(a[row0:row0+n], b[row0:row0+n], out=scratch[:n])
+        np.abs(diff, out=diff)
+        if not (diff <= atol).all():
+            return False
+    return True
+
+
+## \brief np.allclose with a memcmp fast path for byte-identical buffers
+#
+# Byte-identical float buffers are allclose unless they contain NaN, which
+# allclose never accepts; differing bytes may still be within tolerance, so
+# only the equal case short-circuits. Absolute tolerances take the blocked
+# short-circuiting path.
+def _allclose(a, b, rtol=1.e-5, atol=1.e-8):
+    if _bytes_equal(a, b):
+        return not np.isnan(np.asarray(a)).any()
+    if rtol == 0:
+        return _within_tolerance(a, b, atol)
+    return np.allclose(a, b, rtol=rtol, atol=atol)
+
+
 def ecef_to_latlongheight_sphere(p, radius_meters):
     """Convert ECEF coordinates to latitude, longitude, and height.
     
@@ -111,66 +201,157 @@ def ecef_to_latlongheight_sphere(p, radius_meters):
 
 class Landmark:
 
-    def __init__(self, lmk_file):
-        with open(lmk_file, 'rb') as fp:
-            file_data = fp.read()
-
-        # Comment field not read into memory 
+    def __init__(self, lmk_file, copy=True):
+        """Parse a landmark file.
+
+        Args:
+            lmk_file (str or Path): Path to the landmark file
+            copy (bool): When True (default) the srm and ele matrices are
+                copied into writable in-memory arrays. When False they are
+                read-only numpy.memmap views served from the OS page cache,
+                which avoids materializing the rasters for callers that only
+                slice or compare.
+        """
+        if copy:
+            # Map the file instead of reading it whole so the OS pages data on
+            # demand; _from_buffer copies each section out, so the mapping can
+            # be released as soon as parsing is done
+            with open(lmk_file, 'rb') as fp:
+                with mmap.mmap(fp.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                    self._from_buffer(memoryview(mm))
+        else:
+            header_size = 64 + _HDR_DTYPE.itemsize
+            with open(lmk_file, 'rb') as fp:
+                self._parse_header(memoryview(fp.read(header_size)))
+            # Zero-copy big endian views of the matrices; the file backs the
+            # data, so repeated loads in one session share the page cache
+            self.srm = np.memmap(lmk_file, dtype='>u1', mode='r',
+                                 offset=header_size,
+                                 shape=(self.num_rows, self.num_cols))
+            self.ele = np.memmap(lmk_file, dtype='>f4', mode='r',
+                                 offset=header_size + self.num_pixels,
+                                 shape=(self.num_rows, self.num_cols))
+
+    @classmethod
+    def load(cls, lmk_file, writable=False):
+        """Load a landmark through a process-wide cache keyed on path and mtime.
+
+        Repeated loads of the same unmodified file (common when many tests
+        compare against one gold-standard landmark) share a single parsed
+        instance instead of re-reading the rasters from disk. The cached
+        instance has read-only matrices; pass writable=True to get a private
+        deep copy that is safe to edit.
+
+        Args:
+            lmk_file (str or Path): Path to the landmark file
+            writable (bool): Return a mutable copy instead of the shared cached instance
+
+        Returns:
+            Landmark: The parsed landmark
+        """
+        path = os.path.abspath(os.fspath(lmk_file))
+        prototype = _load_cached(path, os.path.getmtime(path))
+        if writable:
+            lmk = copy.deepcopy(prototype)
+            lmk.srm.setflags(write=True)
+            lmk.ele.setflags(write=True)
+            return lmk
+        return prototype
+
+    @classmethod
+    def load_window(cls, lmk_file, y0, x0, height, width):
+        """Load only a window of the srm and ele matrices.
+
+        Built on the copy=False memmap path, so the OS pages in just the rows
+        the window touches instead of the full rasters; slicing a 200x300
+        patch out of a 1000x1000 landmark reads ~6% of the file.
+
+        Args:
+            lmk_file (str or Path): Path to the landmark file
+            y0, x0 (int): Upper-left corner of the window in pixels
+            height, width (int): Window size in pixels
+
+        Returns:
+            tuple: Read-only (srm, ele) views of shape (height, width)
+        """
+        lmk = cls(lmk_file, copy=False)
+        return (lmk.srm[y0:y0+height, x0:x0+width],
+                lmk.ele[y0:y0+height, x0:x0+width])
+
+    @classmethod
+    def from_bytes(cls, buffer):
+        """Build a Landmark from an in-memory big endian file image, skipping disk I/O.
+
+        Args:
+            buffer (bytes-like): Contents of a landmark file
+
+        Returns:
+            Landmark: The parsed landmark
+        """
+        obj = cls.__new__(cls)
+        obj._from_buffer(memoryview(buffer))
+        return obj
+
+    def _parse_header(self, mv):
+        # Comment field not read into memory
         # Skip first 32 chars
-        self.lmk_id =  file_data[32:64]
+        self.lmk_id = bytes(mv[32:64])
         bytes_unpacked = 64
-        
-        [self.BODY, self.num_cols, self.num_rows] = struct.unpack('>iii', file_data[bytes_unpacked:bytes_unpacked+3*4])
-        bytes_unpacked += 3*4
+
+        hdr = np.frombuffer(mv, dtype=_HDR_DTYPE, count=1, offset=bytes_unpacked)[0]
+        bytes_unpacked += _HDR_DTYPE.itemsize
+
+        self.BODY = int(hdr['body'])
+        self.num_cols = int(hdr['num_cols'])
+        self.num_rows = int(hdr['num_rows'])
 
         self.num_pixels = self.num_cols*self.num_rows
 
-        [self.anchor_col, self.anchor_row, self.resolution] = struct.unpack('>ddd', file_data[bytes_unpacked:bytes_unpacked+3*8])
-        bytes_unpacked += 3*8
+        self.anchor_col = float(hdr['anchor_col'])
+        self.anchor_row = float(hdr['anchor_row'])
+        self.resolution = float(hdr['resolution'])
 
-        self.anchor_point = np.array(struct.unpack('>ddd', file_data[bytes_unpacked:bytes_unpacked+3*8]))
-        bytes_unpacked += 3*8
-        
-        self.mapRworld = unpack_matrix('d', [3, 3], file_data[bytes_unpacked:])
-        bytes_unpacked += (3*3)*8
+        self.anchor_point = hdr['anchor_point'].astype(np.float64)
+        self.mapRworld = hdr['mapRworld'].astype(np.float64)
+        return bytes_unpacked
+
+    def _from_buffer(self, mv):
+        bytes_unpacked = self._parse_header(mv)
 
-        self.srm = unpack_matrix('B', [self.num_cols, self.num_rows], file_data[bytes_unpacked:])
+        # Copy the big matrices out of the buffer once, into writable
+        # C-contiguous native-endian arrays, so downstream saves, equality
+        # checks and caller edits never trigger hidden conversion copies
+        self.srm = unpack_matrix('B', [self.num_cols, self.num_rows], mv, offset=bytes_unpacked).copy()
         bytes_unpacked += (self.num_pixels)*1
 
-        self.ele = unpack_matrix('f', [self.num_cols, self.num_rows], file_data[bytes_unpacked:])
+        self.ele = unpack_matrix('f', [self.num_cols, self.num_rows], mv, offset=bytes_unpacked).astype(np.float32)
         bytes_unpacked += (self.num_pixels)*4
 
-    def save(self, lmk_file):
+    def _serialize(self):
         version = b'#! LVS Map v3.0'
         version += b'0'*(32-len(version))
 
-        size = 196 + (self.num_pixels)*1 + (self.num_pixels)*4
-        file_data = bytearray(size)
-        
-        file_data[0:32] = version
-        file_data[32:64] = self.lmk_id
-
-        bytes_packed = 64
-        struct.pack_into('>iii', file_data, bytes_packed, self.BODY, self.num_cols, self.num_rows)
-        bytes_packed += 3*4
-
-        struct.pack_into('>ddd', file_data, bytes_packed, self.anchor_col, self.anchor_row, self.resolution)
-        bytes_packed += 3*8
-
-        pack_matrix('d', self.anchor_point, file_data, bytes_packed)
-        bytes_packed += 3*8
-
-        pack_matrix('d', self.mapRworld, file_data, bytes_packed)
-        bytes_packed += (3*3)*8
-
-        pack_matrix('B', self.srm, file_data, bytes_packed)
-        bytes_packed += (self.num_pixels)*1
-
-        pack_matrix('f', self.ele, file_data, bytes_packed)
-        bytes_packed += (self.num_pixels)*4
+        # The sections in file order, as a list of bytes objects
+        return [
+            version,
+            self.lmk_id,
+            _HDR_III.pack(self.BODY, self.num_cols, self.num_rows),
+            _HDR_DDD.pack(self.anchor_col, self.anchor_row, self.resolution),
+            _matrix_bytes(np.asarray(self.anchor_point), np.dtype('>f8')),
+            _matrix_bytes(np.asarray(self.mapRworld), np.dtype('>f8')),
+            _matrix_bytes(np.asarray(self.srm), np.dtype('>u1')),
+            _matrix_bytes(np.asarray(self.ele), np.dtype('>f4')),
+        ]
+
+    def to_bytes(self):
+        """Return the big endian file image that save would write, as bytes."""
+        return b''.join(self._serialize())
 
+    def save(self, lmk_file):
+        # Hand the sections to the kernel to coalesce instead of zero-filling
+        # one file-sized bytearray up front
         with open(lmk_file, 'wb') as fp:
-            fp.write(file_data)
+            fp.writelines(self._serialize())
 
     def save_legacy_little_endian(self, lmk_file, radius=0.0):
         size = (4*4) + (6*8) + (3*8) + (3*2*8) + (3*2*8) + (3*3*8) + (3*8) + (4*8) + (self.num_pixels)*1 + (self.num_pixels)*4
@@ -178,33 +359,28 @@ class Landmark:
 
         bytes_packed = 0
         # BODY, lmk_id (integer), num_cols, num_rows
-        struct.pack_into('<iiii', file_data, bytes_packed, self.BODY, 1, self.num_cols, self.num_rows)
+        _LEGACY_IIII.pack_into(file_data, bytes_packed, self.BODY, 1, self.num_cols, self.num_rows)
         bytes_packed += 4*4
 
         # anchor_col, anchor_row, lat, lon, radius, resolution
         lat, lon, height = ecef_to_latlongheight_sphere(self.anchor_point, radius)
-        struct.pack_into('<dddddd', file_data, bytes_packed, self.anchor_col, self.anchor_row, lat, lon, radius, self.resolution)
+        _LEGACY_6D.pack_into(file_data, bytes_packed, self.anchor_col, self.anchor_row, lat, lon, radius, self.resolution)
         bytes_packed += 6*8
 
         # anchor_point (x, y, z)
-        struct.pack_into('<ddd', file_data, bytes_packed, *self.anchor_point)
+        _LEGACY_DDD.pack_into(file_data, bytes_packed, *self.anchor_point)
         bytes_packed += 3*8
 
         # Derived matrix: col_row2mapxy (3x2 matrix)
-        col_row2mapxy = np.array([
-            [self.resolution, 0.0, -self.resolution],
-            [0.0, -self.resolution, self.resolution]
-        ])
-        struct.pack_into('<' + 'd'*6, file_data, bytes_packed, *col_row2mapxy.flatten())
+        _LEGACY_6D.pack_into(file_data, bytes_packed,
+                             self.resolution, 0.0, -self.resolution,
+                             0.0, -self.resolution, self.resolution)
         bytes_packed += (3*2)*8
 
-
         # Derived matrix: mapxy2col_row (3x2 matrix)
-        mapxy2col_row = np.array([
-            [1.0/self.resolution, 0.0, 0.0],
-            [0.0, -1.0/self.resolution, 0.0]
-        ])
-        struct.pack_into('<' + 'd'*6, file_data, bytes_packed, *mapxy2col_row.flatten())
+        _LEGACY_6D.pack_into(file_data, bytes_packed,
+                             1.0/self.resolution, 0.0, 0.0,
+                             0.0, -1.0/self.resolution, 0.0)
         bytes_packed += (3*2)*8
 
         # mapRworld (3x3 matrix)
@@ -212,20 +388,13 @@ class Landmark:
         bytes_packed += (3*3)*8
 
         # Derived vector: map_normal_vector (3 doubles)
-        map_normal_vector = np.array([
-            self.mapRworld[2,0],
-            self.mapRworld[2,1],
-            self.mapRworld[2,2]
-        ])
-        struct.pack_into('<' + 'd'*3, file_data, bytes_packed, *map_normal_vector)
+        nx, ny, nz = self.mapRworld[2,0], self.mapRworld[2,1], self.mapRworld[2,2]
+        _LEGACY_DDD.pack_into(file_data, bytes_packed, nx, ny, nz)
         bytes_packed += 3*8
 
         # Derived vector: map_plane_params (4 doubles)
-        dot_product = np.dot(map_normal_vector, self.anchor_point)
-        map_plane_params = np.zeros(4)
-        map_plane_params[:3] = map_normal_vector
-        map_plane_params[3] = -dot_product
-        struct.pack_into('<' + 'd'*4, file_data, bytes_packed, *map_plane_params)
+        dot_product = nx*self.anchor_point[0] + ny*self.anchor_point[1] + nz*self.anchor_point[2]
+        struct.pack_into('<' + 'd'*4, file_data, bytes_packed, nx, ny, nz, -dot_product)
         bytes_packed += 4*8
 
         # srm matrix (B uint8)
@@ -251,8 +420,9 @@ class Landmark:
                 self.resolution == other.resolution and \
                 np.allclose(self.anchor_point, other.anchor_point) and \
                 np.allclose(self.mapRworld, other.mapRworld, rtol=0, atol=1e-4) and \
-                np.allclose(self.srm, other.srm) and \
-                np.allclose(self.ele, other.ele)
+                _array_equal(self.srm, other.srm) and \
+                self.ele.shape == other.ele.shape and \
+                _allclose(self.ele, other.ele)
         return NotImplemented
 
     def approx_equal(self, other, elevation_tolerance):
@@ -266,39 +436,54 @@ class Landmark:
                 self.resolution == other.resolution and \
                 np.allclose(self.anchor_point, other.anchor_point) and \
                 np.allclose(self.mapRworld, other.mapRworld, rtol=0, atol=1e-4) and \
-                np.allclose(self.srm, other.srm) and \
-                np.allclose(self.ele, other.ele, rtol=0, atol=elevation_tolerance)
+                _array_equal(self.srm, other.srm) and \
+                self.ele.shape == other.ele.shape and \
+                _allclose(self.ele, other.ele, rtol=0, atol=elevation_tolerance)
         return NotImplemented
 
     def assess_equality(self, other):
+        if not isinstance(other, Landmark):
+            return NotImplemented
+
         if self == other :
             print("Objects are equal")
-        elif isinstance(other, Landmark):
-            if(self.BODY != other.BODY):
-                print("self.BODY = {} other.BODY = {}", self.BODY, other.BODY)
-            if(self.lmk_id != other.lmk_id):
-                print("self.lmk_id = {} other.lmk_id = {}", self.lmk_id, other.lmk_id)
-            if(self.num_cols != other.num_cols):
-                print("self.num_cols = {} other.num_cols = {}", self.num_cols, other.num_cols)
-            if(self.num_rows != other.num_rows):
-                print("self.num_rows = {} other.num_rows = {}", self.num_rows, other.num_rows)
-            if(self.anchor_col != other.anchor_col):
-                print("self.anchor_col = {} other.anchor_col = {}", self.anchor_col, other.anchor_col)
-            if(self.anchor_row != other.anchor_row):
-                print("self.anchor_row = {} other.anchor_row = {}", self.anchor_row, other.anchor_row)
-            if(self.resolution != other.resolution):
-                print("self.resolution = {} other.resolution = {}", self.resolution, other.resolution)
-        
-            if(not np.allclose(self.anchor_point, other.anchor_point)):
-                print("self.anchor_point != other.anchor_point")
-            if(not np.allclose(self.mapRworld, other.mapRworld, rtol=0, atol=1e-4)):
-                print("self.mapRworld != other.mapRworld")
-            if(not np.allclose(self.srm, other.srm)):
-                print("self.srm != other.srm")
-            if(not np.allclose(self.ele, other.ele)):
-                print("self.ele != other.ele")
-        else:
-            return NotImplemented
+            return
+
+        # Report the cheap scalar fields first; when any of them differ there
+        # is no reason to scan the large matrices
+        scalars_equal = True
+        if(self.BODY != other.BODY):
+            print("self.BODY = {} other.BODY = {}", self.BODY, other.BODY)
+            scalars_equal = False
+        if(self.lmk_id != other.lmk_id):
+            print("self.lmk_id = {} other.lmk_id = {}", self.lmk_id, other.lmk_id)
+            scalars_equal = False
+        if(self.num_cols != other.num_cols):
+            print("self.num_cols = {} other.num_cols = {}", self.num_cols, other.num_cols)
+            scalars_equal = False
+        if(self.num_rows != other.num_rows):
+            print("self.num_rows = {} other.num_rows = {}", self.num_rows, other.num_rows)
+            scalars_equal = False
+        if(self.anchor_col != other.anchor_col):
+            print("self.anchor_col = {} other.anchor_col = {}", self.anchor_col, other.anchor_col)
+            scalars_equal = False
+        if(self.anchor_row != other.anchor_row):
+            print("self.anchor_row = {} other.anchor_row = {}", self.anchor_row, other.anchor_row)
+            scalars_equal = False
+        if(self.resolution != other.resolution):
+            print("self.resolution = {} other.resolution = {}", self.resolution, other.resolution)
+            scalars_equal = False
+        if not scalars_equal:
+            return
+
+        if(not np.allclose(self.anchor_point, other.anchor_point)):
+            print("self.anchor_point != other.anchor_point")
+        if(not np.allclose(self.mapRworld, other.mapRworld, rtol=0, atol=1e-4)):
+            print("self.mapRworld != other.mapRworld")
+        if(not np.array_equal(self.srm, other.srm)):
+            print("self.srm != other.srm")
+        if(self.ele.shape != other.ele.shape or not np.allclose(self.ele, other.ele)):
+            print("self.ele != other.ele")
     
     
     def __str__(self):
@@ -25,48 +25,135 @@
 #  
 
 import numpy as np
-import matplotlib.pyplot as plt
-from skimage.measure import block_reduce
-from visualize_corr import loadAllDisplacementMatrices
+
+## \brief Reusable pooling scratch and output buffers keyed by input shape,
+#  patch size and dtype, so sweeps over many same-sized DEMs reuse
+#  allocations instead of churning the allocator every call
+_pool_scratch = {}
+_pool_out = {}
+
+def block_nanmean(mat, patch_size, out=None, valid=None):
+    """Mean-pool mat over patch_size blocks, ignoring NaN values.
+
+    Matches skimage.measure.block_reduce(mat, patch_size, np.nanmean),
+    including its zero padding of ragged edges, but runs as vectorized
+    reshape-and-sum passes instead of a Python reduction per block.
+    Scratch buffers are cached per (shape, patch_size, dtype) and reused
+    across calls.
+
+    Args:
+        out (ndarray, optional): Preallocated float64 output of shape
+            (ceil(h/ph), ceil(w/pw)). Allocated fresh when omitted.
+        valid (ndarray, optional): Boolean validity mask of mat's shape.
+            When given, it replaces the per-array isnan pass, so one mask
+            shared across several same-shaped arrays is computed only once.
+    """
+    ph, pw = int(patch_size[0]), int(patch_size[1])
+    h, w = mat.shape
+    hp, wp = -(-h // ph) * ph, -(-w // pw) * pw
+    key = (mat.shape, (ph, pw), mat.dtype.str)
+    bufs = _pool_scratch.get(key)
+    if bufs is None:
+        # np.zeros keeps the ragged-edge padding permanently zeroed; the
+        # in-bounds region is overwritten below on every call
+        bufs = (
+            np.zeros((hp, wp), dtype=mat.dtype),
+            np.empty((hp, wp), dtype=bool),
+            np.empty((hp//ph, wp//pw), dtype=np.float64),
+        )
+        _pool_scratch[key] = bufs
+    padded, maskbuf, count = bufs
+    padded[:h, :w] = mat
+    if valid is None:
+        np.isnan(padded, out=maskbuf)
+    else:
+        # Invert into the scratch so the zero-fill below sees "invalid";
+        # the ragged-edge padding counts as valid zeros either way
+        np.logical_not(valid, out=maskbuf[:h, :w])
+        if (hp, wp) != (h, w):
+            maskbuf[h:, :] = False
+            maskbuf[:, w:] = False
+    padded[maskbuf] = 0
+    np.logical_not(maskbuf, out=maskbuf)
+    blocks = padded.reshape(hp//ph, ph, wp//pw, pw)
+    vblocks = maskbuf.reshape(hp//ph, ph, wp//pw, pw)
+    if out is None:
+        out = np.empty((hp//ph, wp//pw), dtype=np.float64)
+    blocks.sum(axis=(1, 3), out=out)
+    vblocks.sum(axis=(1, 3), out=count)
+    with np.errstate(invalid='ignore'):
+        # All-NaN blocks divide 0/0 and stay NaN, like nanmean
+        np.divide(out, count, out=out)
+    return out
 
 def quiver_plot(dx, dy, dz, grid_spacing_m=10, min_displacement_m = 10, patch_size=(10,10), arrow_scale=1):
+    # Imported here so batch invocations that never plot (or only pool)
+    # don't pay matplotlib's startup cost per process
+    import matplotlib.pyplot as plt
+    from matplotlib.collections import LineCollection
+
     # --- Pooling (Mean over patches) ---
-    dx_pool = block_reduce(dx, patch_size, np.nanmean)
-    dy_pool = block_reduce(dy, patch_size, np.nanmean)
-    dz_pool = block_reduce(dz, patch_size, np.nanmean)
-
-    # --- Coordinates of patch centers (in meters) ---
-    x_pool, y_pool = np.meshgrid(
-        np.arange(dx_pool.shape[1]) * grid_spacing_m * patch_size[1] + grid_spacing_m * patch_size[1] / 2,
-        np.arange(dx_pool.shape[0]) * grid_spacing_m * patch_size[0] + grid_spacing_m * patch_size[0] / 2
-    )
+    ph, pw = int(patch_size[0]), int(patch_size[1])
+    key = (dx.shape, (ph, pw))
+    outs = _pool_out.get(key)
+    if outs is None:
+        pooled_shape = (-(-dx.shape[0] // ph), -(-dx.shape[1] // pw))
+        outs = tuple(np.empty(pooled_shape, dtype=np.float64) for _ in range(3))
+        _pool_out[key] = outs
+    # One fused validity pass shared by all three arrays instead of an
+    # isnan walk per component; a pixel invalid in any component is
+    # excluded from all three pools so the arrows stay consistent
+    valid = np.isfinite(dx)
+    np.logical_and(valid, np.isfinite(dy), out=valid)
+    np.logical_and(valid, np.isfinite(dz), out=valid)
+    dx_pool = block_nanmean(dx, patch_size, out=outs[0], valid=valid)
+    dy_pool = block_nanmean(dy, patch_size, out=outs[1], valid=valid)
+    dz_pool = block_nanmean(dz, patch_size, out=outs[2], valid=valid)
 
     # --- Mask small vectors AFTER pooling ---
-    magnitude_pool = np.sqrt(dx_pool**2 + dy_pool**2)
-    mask = np.logical_and((magnitude_pool >= min_displacement_m), np.logical_not(np.isnan(magnitude_pool)))
+    # Compare squared magnitudes to skip the per-element sqrt; NaN patches
+    # compare False, so no separate isnan pass is needed
+    mag2_pool = dx_pool*dx_pool + dy_pool*dy_pool
+    mask = mag2_pool >= min_displacement_m**2
+    ii, jj = np.nonzero(mask)
 
-    x_masked = x_pool[mask]
-    y_masked = y_pool[mask]
-    dx_masked = dx_pool[mask]
-    dy_masked = dy_pool[mask]
-    dz_masked = dz_pool[mask]
+    # --- Coordinates of the surviving patch centers (in meters) ---
+    x_masked = (jj + 0.5) * grid_spacing_m * patch_size[1]
+    y_masked = (ii + 0.5) * grid_spacing_m * patch_size[0]
+    dx_masked = dx_pool[ii, jj]
+    dy_masked = dy_pool[ii, jj]
+    dz_masked = dz_pool[ii, jj]
 
     # --- Plot ---
     fig = plt.figure(figsize=(10, 8))
+    ax = plt.gca()
 
-    q = plt.quiver(
-        x_masked, y_masked,        # Position in meters
-        dx_masked, dy_masked,      # Displacement in meters
-        dz_masked,                 # Color mapped to dz
-        cmap='viridis',
-        scale=arrow_scale,                   # True scale (1 m displacement = 1 m in plot)
-        scale_units='xy',
-        angles='xy'
+    # Precompute all arrow segments and hand them to a single LineCollection;
+    # quiver rebuilds per-arrow paths and angle normalizations on every draw.
+    # Lengths match quiver's scale/scale_units='xy' convention (1/arrow_scale)
+    segs = np.stack(
+        [
+            np.column_stack([x_masked, y_masked]),
+            np.column_stack(
+                [x_masked + dx_masked / arrow_scale, y_masked + dy_masked / arrow_scale]
+            ),
+        ],
+        axis=1,
     )
+    cmap = plt.get_cmap('viridis')
+    if dz_masked.size > 0:
+        norm = plt.Normalize(np.min(dz_masked), np.max(dz_masked))
+    else:
+        norm = plt.Normalize(0, 1)
+    lc = LineCollection(segs, colors=cmap(norm(dz_masked)))
+    ax.add_collection(lc)
+    ax.autoscale_view()
 
-    plt.colorbar(q, label='Displacement Z (m)')
-    plt.gca().set_aspect('equal')
-    plt.gca().invert_yaxis()
+    mappable = plt.cm.ScalarMappable(norm=norm, cmap=cmap)
+    mappable.set_array(dz_masked)
+    plt.colorbar(mappable, ax=ax, label='Displacement Z (m)')
+    ax.set_aspect('equal')
+    ax.invert_yaxis()
     plt.xlabel('X (m)')
     plt.ylabel('Y (m)')
     plt.title('Displacement Field (Mean Pooled over {}x{} pixel patches, \n displacement > {}m only)'.format(patch_size[0], patch_size[1], min_displacement_m))
@@ -80,6 +167,8 @@ if __name__=='__main__':
     import argparse
     import glob
 
+    from visualize_corr import loadAllDisplacementMatrices
+
     parser = argparse.ArgumentParser(
                     prog='DEMCorrelationQuiverPlot',
                     description='Visualize the output of landmark_comparison using a quiver plot')
@@ -96,7 +185,9 @@ if __name__=='__main__':
 
     args = parser.parse_args()
 
-    displacement_maps = loadAllDisplacementMatrices(args.prefix, args.width, args.height)
+    # Memory-map the rasters: the pooling pass touches each element once in
+    # order, so pages stream from disk instead of tripling resident memory
+    displacement_maps = loadAllDisplacementMatrices(args.prefix, args.width, args.height, use_mmap=True)
     fig = quiver_plot(displacement_maps['dx'], displacement_maps['dy'], displacement_maps['dz'], 
                 args.grid_spacing_m, args.min_displacement_m, (args.patch_size, args.patch_size), args.arrow_scale)
     if args.save_as is not None:
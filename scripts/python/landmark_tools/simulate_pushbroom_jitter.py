@@ -25,9 +25,173 @@
 #  
 
 import argparse
+import functools
+
 import numpy as np
-from skimage import io
-from skimage.transform import warp
+
+try:
+    import cv2
+except ImportError:
+    cv2 = None
+
+## \brief Image dtypes cv2.remap can interpolate; anything else falls back
+#  to skimage.transform.warp
+_REMAP_DTYPES = (np.uint8, np.uint16, np.int16, np.float32)
+
+def _axis_aligned_jitter(image, n_x, n_y, distance, half_width):
+    """Separable warp for axis-aligned scanlines.
+
+    When the scanline is horizontal or vertical the inverse map moves
+    pixels along a single axis and is constant along the other, so the
+    2-D coordinate grid collapses to one 1-D lookup shared by every line
+    crossing the band. Returns None for oblique angles.
+    """
+    tol = 1e-8
+    if abs(n_x) < tol:
+        axis, normal = 1, n_y
+    elif abs(n_y) < tol:
+        axis, normal = 0, n_x
+    else:
+        return None
+    size = image.shape[axis]
+    sgn = 1.0 if normal > 0 else -1.0
+
+    # Indices crossing the band, padded for bilinear support
+    margin = 2
+    bounds = sorted((sgn * (distance - half_width), sgn * (distance + half_width)))
+    lo = max(int(np.floor(bounds[0])) - margin, 0)
+    hi = min(int(np.ceil(bounds[1])) + margin + 1, size)
+    if lo >= hi:
+        return image.copy()
+
+    # 1-D source positions along the axis, same compression law as the
+    # general transform with the other axis dropping out
+    idx = np.arange(lo, hi, dtype=np.float32)
+    dist_perp = np.float32(sgn) * idx - np.float32(distance)
+    # Branchless: outside the band 0.5 + 0.5|dp|/hw exceeds 1 and clamps
+    # to the identity scale
+    scale = np.abs(dist_perp)
+    scale *= np.float32(0.5 / half_width)
+    scale += np.float32(0.5)
+    np.minimum(scale, np.float32(1.0), out=scale)
+    # The map is the identity plus (scale - 1) * dist_perp along the
+    # normal, so fold scale into that displacement directly
+    delta = scale
+    delta -= np.float32(1.0)
+    delta *= dist_perp
+    pos = idx
+    pos += np.float32(sgn) * delta
+
+    # Bilinear gather with replicated borders: clamp the source position
+    # itself so samples past the frame edge replicate the edge pixel with
+    # zero fractional weight, matching warp's mode='edge'
+    np.clip(pos, np.float32(0), np.float32(size - 1), out=pos)
+    i0 = np.floor(pos).astype(np.intp)
+    w = (pos - i0).astype(np.float32)
+    i1 = np.minimum(i0 + 1, size - 1)
+    if axis == 0:
+        a = image[i0].astype(np.float32)
+        b = image[i1].astype(np.float32)
+        w = w.reshape((-1,) + (1,) * (image.ndim - 1))
+    else:
+        a = image[:, i0].astype(np.float32)
+        b = image[:, i1].astype(np.float32)
+        w = w.reshape((1, -1) + (1,) * (image.ndim - 2))
+    strip = a + (b - a) * w
+    if np.issubdtype(image.dtype, np.integer):
+        np.rint(strip, out=strip)
+
+    # The slice assignment casts back to the frame's dtype in place; no
+    # intermediate astype copy of the strip is needed
+    jittered = image.copy()
+    if axis == 0:
+        jittered[lo:hi] = strip
+    else:
+        jittered[:, lo:hi] = strip
+    return jittered
+
+@functools.lru_cache(maxsize=8)
+def _build_maps(H, W, angle_deg, distance, num_disrupted):
+    """Build the crop-local inverse map for cv2.remap.
+
+    Returns (r0, r1, c0, c1, map_x, map_y) covering the disrupted strip's
+    bounding box, or None when the band misses the frame entirely. Batch
+    runs over same-sized frames with identical geometry (the common
+    simulated-sequence case) hit the cache and pay the coordinate math
+    only once, so per-frame cost reduces to the remap interpolation.
+
+    skimage.transform.warp hands its callable (col, row) pairs, so the
+    fallback closure effectively applies the line equation with row in
+    the x slot; this LUT reproduces that orientation exactly.
+    """
+    angle_rad = np.deg2rad(angle_deg)
+    d_x = np.cos(angle_rad)
+    d_y = np.sin(angle_rad)
+    n_x = -np.sin(angle_rad)
+    n_y = np.cos(angle_rad)
+    half_width = num_disrupted / 2.0
+
+    # Outside the strip |dist_perp| < half_width the map is the identity,
+    # so only the strip's bounding box (usually a few percent of the
+    # frame) needs coordinate math and interpolation. The boundary lines
+    # are linear in (rr, cc), so their extrema over the frame sit at the
+    # edges; a small margin covers bilinear support. Sources sampled
+    # inside the band stay inside it, so the crop is self-contained
+    margin = 2
+    if abs(n_x) > 1e-12:
+        rr_cand = [(distance + s * half_width - cc * n_y) / n_x
+                   for s in (-1.0, 1.0) for cc in (0.0, W - 1.0)]
+        r0 = max(int(np.floor(min(rr_cand))) - margin, 0)
+        r1 = min(int(np.ceil(max(rr_cand))) + margin + 1, H)
+    else:
+        r0, r1 = 0, H
+    if abs(n_y) > 1e-12:
+        cc_cand = [(distance + s * half_width - rr * n_x) / n_y
+                   for s in (-1.0, 1.0) for rr in (0.0, H - 1.0)]
+        c0 = max(int(np.floor(min(cc_cand))) - margin, 0)
+        c1 = min(int(np.ceil(max(cc_cand))) + margin + 1, W)
+    else:
+        c0, c1 = 0, W
+    if r0 >= r1 or c0 >= c1:
+        return None
+
+    rr, cc = np.meshgrid(
+        np.arange(r0, r1, dtype=np.float32), np.arange(c0, c1, dtype=np.float32),
+        indexing='ij'
+    )
+    dist_perp = rr * np.float32(n_x) + cc * np.float32(n_y)
+    dist_perp -= np.float32(distance)
+
+    # Branchless scale: outside the band the expression exceeds 1 and the
+    # clamp restores the identity, so no masked gather/scatter is needed
+    scale = np.abs(dist_perp)
+    scale *= np.float32(0.5 / half_width)
+    scale += np.float32(0.5)
+    np.minimum(scale, np.float32(1.0), out=scale)
+
+    # Since (n, d) is orthonormal the map collapses to the identity plus
+    # (scale - 1) * dist_perp along the normal, which removes the
+    # along-line projection and its recombination entirely
+    delta = scale
+    delta -= np.float32(1.0)
+    delta *= dist_perp
+    map_y = rr
+    map_y += delta * np.float32(n_x)
+    map_x = cc
+    map_x += delta * np.float32(n_y)
+    # Shift the maps into crop-local coordinates
+    map_y -= np.float32(r0)
+    map_x -= np.float32(c0)
+    # Pack into OpenCV's fixed-point representation (int16 integer pairs
+    # plus a fraction-table index): remap's 16-bit SIMD kernel moves half
+    # the bytes of float32 maps. Positions quantize to 1/32 px, well
+    # inside bilinear error for imagery
+    map1, map2 = cv2.convertMaps(map_x, map_y, cv2.CV_16SC2)
+    # The cached arrays are shared between callers; freeze them so a
+    # stray in-place edit can't poison later frames
+    map1.setflags(write=False)
+    map2.setflags(write=False)
+    return r0, r1, c0, c1, map1, map2
 
 def simulate_pushbroom_jitter(image, angle_deg, distance, num_disrupted):
     """
@@ -52,44 +216,157 @@ def simulate_pushbroom_jitter(image, angle_deg, distance, num_disrupted):
 
     half_width = num_disrupted / 2.0
 
+    # A zero-width band, or one whose strip never crosses the frame,
+    # reduces to the identity warp: skip the interpolation pass outright
+    if num_disrupted <= 0:
+        return image.copy()
+    H, W = image.shape[:2]
+    corner_perp = [r * n_x + c * n_y - distance
+                   for r in (0.0, H - 1.0) for c in (0.0, W - 1.0)]
+    if min(corner_perp) >= half_width or max(corner_perp) <= -half_width:
+        return image.copy()
+
+    # Horizontal/vertical scanlines (the common case) warp separably
+    # along one axis; skip the 2-D coordinate grid entirely
+    jittered = _axis_aligned_jitter(image, n_x, n_y, distance, half_width)
+    if jittered is not None:
+        return jittered
+
+    if cv2 is not None and image.dtype.type in _REMAP_DTYPES:
+        # Look up (or build) the float32 LUT and hand it to cv2.remap,
+        # whose SIMD bilinear path is roughly an order of magnitude
+        # faster than warp's generic tile-by-tile callback loop
+        maps = _build_maps(H, W, float(angle_deg), float(distance), float(num_disrupted))
+        if maps is None:
+            # The disrupted band misses the frame entirely
+            return image.copy()
+        r0, r1, c0, c1, map_x, map_y = maps
+        # Paste the warped strip over a copy of the untouched frame
+        jittered = image.copy()
+        jittered[r0:r1, c0:c1] = cv2.remap(
+            image[r0:r1, c0:c1], map_x, map_y,
+            interpolation=cv2.INTER_LINEAR,
+            borderMode=cv2.BORDER_REPLICATE,
+        )
+        return jittered
+
+    # Tile size for the fallback coordinate math: the three scratch buffers
+    # below total ~0.75 MB at this size, so every op after the loads from
+    # coords runs against L2 instead of streaming full-size temporaries
+    # through DRAM
+    block = 65536
+    dist_perp = np.empty(block, dtype=np.float32)
+    scale = np.empty(block, dtype=np.float32)
+    tmp = np.empty(block, dtype=np.float32)
+
     def transform(coords):
         """
         coords: Nx2 array of (row, col) coordinate pairs
         """
 
-        rr = coords[:, 0]  # row -> y
-        cc = coords[:, 1]  # col -> x
+        # Sub-pixel precision beyond float32 is meaningless for bilinear
+        # sampling, and halving the element size halves the bytes this
+        # memory-bound kernel moves
+        coords = coords.astype(np.float32, copy=False)
+        N = coords.shape[0]
+        out = np.empty((N, 2), dtype=np.float32)
+
+        for start in range(0, N, block):
+            end = min(start + block, N)
+            n = end - start
+            rr = coords[start:end, 0]  # row -> y
+            cc = coords[start:end, 1]  # col -> x
+            dp = dist_perp[:n]
+            sc = scale[:n]
+            t = tmp[:n]
 
-        # Distance between scanline and coordinate
-        dist_perp = (cc * n_x + rr * n_y) - distance
+            # Distance between scanline and coordinate
+            np.multiply(cc, np.float32(n_x), out=dp)
+            np.multiply(rr, np.float32(n_y), out=t)
+            dp += t
+            dp -= np.float32(distance)
 
-        # How far along the scanline the coordinate lies
-        dist_line = (cc * d_x + rr * d_y)
+            # Scale factor in the disrupted region, branchless: outside
+            # the band the expression exceeds 1 and clamps to identity
+            np.abs(dp, out=sc)
+            sc *= np.float32(0.5 / half_width)
+            sc += np.float32(0.5)
+            np.minimum(sc, np.float32(1.0), out=sc)
 
-        # Scale factor in the disrupted region
-        scale = np.ones_like(rr)
-        inside_mask = np.abs(dist_perp) < half_width
-        scale[inside_mask] = 0.5 + 0.5 * (np.abs(dist_perp[inside_mask]) / half_width)
+            # The map is the identity plus (scale - 1) * dist_perp along
+            # the normal — the along-line projection cancels out, so the
+            # output is just the input displaced by delta * n
+            sc -= np.float32(1.0)
+            sc *= dp
 
-        # Reconstruct final normal coordinate => distance + compressed offset
-        final_n = scale * dist_perp + distance
+            new_y = np.multiply(sc, np.float32(n_y), out=out[start:end, 0])
+            new_y += rr
+            new_x = np.multiply(sc, np.float32(n_x), out=out[start:end, 1])
+            new_x += cc
 
-        # Convert back to (x, y)
-        new_x = final_n * n_x + dist_line * d_x
-        new_y = final_n * n_y + dist_line * d_y
+        return out
 
-        return np.vstack([new_y, new_x]).T
+    # Drive ndi.map_coordinates directly with the precomputed source grid
+    # instead of going through skimage.warp, which would convert the frame
+    # to float64 and re-enter Python through its callback machinery. One
+    # fused interpolation call per channel, on the native dtype
+    from scipy import ndimage as ndi
 
-    jittered = warp(
-        image,
-        inverse_map=transform,
-        mode='edge',
-        preserve_range=True
+    coords = np.empty((H * W, 2), dtype=np.float32)
+    # warp's convention hands the callable (col, row) pairs
+    rr, cc = np.meshgrid(
+        np.arange(H, dtype=np.float32), np.arange(W, dtype=np.float32),
+        indexing='ij'
     )
+    coords[:, 0] = cc.ravel()
+    coords[:, 1] = rr.ravel()
+    mapped = transform(coords)
+    src_col = mapped[:, 0].reshape(H, W)
+    src_row = mapped[:, 1].reshape(H, W)
+
+    jittered = np.empty_like(image)
+    if image.ndim == 2:
+        ndi.map_coordinates(image, [src_row, src_col], output=jittered,
+                            order=1, mode='nearest')
+    else:
+        for channel in range(image.shape[2]):
+            ndi.map_coordinates(image[:, :, channel], [src_row, src_col],
+                                output=jittered[:, :, channel],
+                                order=1, mode='nearest')
+    return jittered
+
+def simulate_pushbroom_jitter_blocks(image, angle_deg, distance, num_disrupted,
+                                     out=None, block_rows=4096):
+    """Apply the jitter warp in row blocks for larger-than-RAM scenes.
 
-    return jittered.astype(image.dtype)
+    The warp displaces pixels at most half the band width along the
+    normal, so each block is processed with that much overlap and only
+    its central rows are written out. Shifting a block by r rows is
+    equivalent to shifting the line offset by r*n_x, so every block
+    reuses the ordinary warp with an adjusted distance. image and out
+    may both be memmaps; peak working memory is O(block_rows * W).
+    """
+    H = image.shape[0]
+    if out is None:
+        out = np.empty_like(image)
+    n_x = -np.sin(np.deg2rad(angle_deg))
+    overlap = int(np.ceil(num_disrupted / 2.0)) + 2
+    for r0 in range(0, H, block_rows):
+        r1 = min(r0 + block_rows, H)
+        lo = max(r0 - overlap, 0)
+        hi = min(r1 + overlap, H)
+        block = np.ascontiguousarray(image[lo:hi])
+        warped = simulate_pushbroom_jitter(
+            block, angle_deg, distance - lo * n_x, num_disrupted
+        )
+        out[r0:r1] = warped[r0 - lo:r1 - lo]
+    return out
 
 def main():
+    # Imported here so pipelines importing this module for the warp alone
+    # don't pay skimage's startup cost
+    from skimage import io
+
     parser = argparse.ArgumentParser(
         description="Simulate pushbroom image jitter for a given angle, distance, and number of disrupted scanlines."
     )
@@ -103,16 +380,41 @@ def main():
                         help="Number of disrupted scanlines (width of region).")
     args = parser.parse_args()
 
-    image = io.imread(args.input_image)
-
-    jittered_image = simulate_pushbroom_jitter(
-        image,
-        angle_deg=args.angle,
-        distance=args.distance,
-        num_disrupted=args.num_disrupted
-    )
+    tiff_exts = ('.tif', '.tiff')
+    image = None
+    if args.input_image.lower().endswith(tiff_exts):
+        # Memory-map large pushbroom strips instead of decoding them
+        # whole; only uncompressed contiguous TIFFs are mappable
+        try:
+            import tifffile
+            image = tifffile.memmap(args.input_image, mode='r')
+        except (ImportError, ValueError):
+            image = None
+    if image is None:
+        image = io.imread(args.input_image)
 
-    io.imsave(args.output_image, jittered_image)
+    if isinstance(image, np.memmap) and args.output_image.lower().endswith(tiff_exts):
+        # Stream block by block into an output memmap so peak memory
+        # stays bounded by the block size, not the scene
+        import tifffile
+        out = tifffile.memmap(args.output_image, shape=image.shape,
+                              dtype=image.dtype)
+        simulate_pushbroom_jitter_blocks(
+            image,
+            angle_deg=args.angle,
+            distance=args.distance,
+            num_disrupted=args.num_disrupted,
+            out=out
+        )
+        out.flush()
+    else:
+        jittered_image = simulate_pushbroom_jitter_blocks(
+            image,
+            angle_deg=args.angle,
+            distance=args.distance,
+            num_disrupted=args.num_disrupted
+        )
+        io.imsave(args.output_image, jittered_image)
 
 if __name__ == "__main__":
     main()
@@ -17,14 +17,29 @@
 #  See the License for the specific language governing permissions and
 #  limitations under the License.
 
-import matplotlib.pyplot as plt
-plt.rcParams.update({'font.size': 14})
-
 import numpy as np
 from PIL import Image
 import glob
 
-def readBinaryImage(filename, width, height, dtype='float32', save_image=False):
+## \brief Lazily imported pyplot module, populated on the first plotting call
+_plt = None
+
+def _pyplot():
+    """Import matplotlib on first use so that consumers of the loaders alone
+    (tests, quiver pooling) never pay matplotlib's startup cost."""
+    global _plt
+    if _plt is None:
+        import matplotlib.pyplot as plt
+        plt.rcParams.update({'font.size': 14})
+        _plt = plt
+    return _plt
+
+def readBinaryImage(filename, width, height, dtype='float32', save_image=False, use_mmap=False):
+    if use_mmap and not save_image:
+        # Map the raster instead of reading it eagerly; sequential consumers
+        # like the quiver_plot pooling pass stream pages in via OS readahead
+        # instead of holding the full-resolution array in RAM
+        return np.memmap(filename, dtype=dtype, mode='r', shape=(height, width))
     I = np.fromfile(filename, dtype=dtype)
     if(save_image):
         saveAsImage(I, filename.replace(".raw", ".tif"))
@@ -33,7 +48,7 @@ def readBinaryImage(filename, width, height, dtype='float32', save_image=False):
 def saveAsImage(I, filename):
     Image.fromarray(I).save(filename)
 
-def loadAllDisplacementMatrices(prefix, width, height, save_image=False):
+def loadAllDisplacementMatrices(prefix, width, height, save_image=False, use_mmap=False):
     coor_files = glob.glob(prefix + "*.raw")
     displacement_maps = {}
     for filepath in coor_files:
@@ -50,11 +65,59 @@ def loadAllDisplacementMatrices(prefix, width, height, save_image=False):
         else:
             continue
  
-        I = readBinaryImage(filepath, width, height, save_image=save_image)
+        I = readBinaryImage(filepath, width, height, save_image=save_image, use_mmap=use_mmap)
         displacement_maps[key] = I
     return displacement_maps
 
+def loadAllDisplacementMatricesStacked(prefix, width, height, keys=None, use_mmap=False):
+    """Load the displacement maps into one contiguous (k, height, width) block.
+
+    Consumers that treat all maps alike (batched comparisons, reductions) can
+    then run a single numpy pass over the stack instead of dispatching per key.
+
+    Args:
+        keys (sequence, optional): Keys to stack, in order. Defaults to all
+            discovered keys, sorted.
+
+    Returns:
+        tuple: (list of keys, stacked float32 array of shape (k, height, width))
+    """
+    displacement_maps = loadAllDisplacementMatrices(prefix, width, height, use_mmap=use_mmap)
+    if keys is None:
+        keys = sorted(displacement_maps)
+    return list(keys), np.stack([displacement_maps[key] for key in keys])
+
+def assert_maps_close(maps1, maps2, atol, keys=None):
+    """Assert that two sets of displacement maps agree within an absolute tolerance.
+
+    The selected maps are stacked and checked in a single pass over one
+    (k, height, width) block instead of a Python loop of per-key comparisons.
+    Entries that are NaN in either map are ignored. On failure the message
+    names the worst offending key and its largest difference.
+
+    Args:
+        maps1, maps2 (dict): Displacement maps as returned by
+            loadAllDisplacementMatrices
+        atol (float): Absolute tolerance shared by the selected keys
+        keys (sequence, optional): Keys to compare. Defaults to all keys of
+            maps1, which must then all be present in maps2.
+    """
+    if keys is None:
+        keys = sorted(maps1)
+    keys = list(keys)
+    diff = np.abs(np.stack([maps1[key] for key in keys])
+                  - np.stack([maps2[key] for key in keys]))
+    with np.errstate(invalid='ignore'):
+        # NaN compares False, so entries missing on either side never flag
+        bad = diff > atol
+    if bad.any():
+        k_idx = int(np.argmax(bad.sum(axis=(1, 2))))
+        raise AssertionError(
+            "map '{}' differs by up to {} (atol={})".format(
+                keys[k_idx], np.nanmax(diff[k_idx]), atol))
+
 def visualize_displacement(I, output_prefix, title_str, mask, limits=None, fig=None, ax=None, colorbar_label="Meters"):
+    plt = _pyplot()
 
     if limits is None:
         m = np.mean(I[~mask])
@@ -84,6 +147,7 @@ def visualize_displacement(I, output_prefix, title_str, mask, limits=None, fig=N
         fig.savefig(output_prefix + '.png')
 
 def visualize_correlation(correlation_map, output_prefix, title_str, fig=None, ax=None):
+    plt = _pyplot()
 
     if ax is None or fig is None:
         fig, ax = plt.subplots()
@@ -107,6 +171,7 @@ def visualize_correlation(correlation_map, output_prefix, title_str, fig=None, a
         fig.savefig(output_prefix + '_correlation.png')
 
 def corr_histogram(I, output_prefix, title_str, mask, num_bins=50, fig=None, ax1=None, ax2=None, limits=None, ax2_title=None):
+    plt = _pyplot()
 
     if ax1 is None or fig is None:
         fig = plt.figure()
@@ -158,6 +223,7 @@ def corr_histogram(I, output_prefix, title_str, mask, num_bins=50, fig=None, ax1
         plt.savefig(output_prefix + '-histogram.png')
 
 def displayAllDisplacement(displacement_maps, filepath_prefix, on_grid=True):
+    plt = _pyplot()
     for key,I in displacement_maps.items():
         if key == 'dx':
             title = "Delta X"
@@ -188,6 +254,7 @@ def displayAllDisplacement(displacement_maps, filepath_prefix, on_grid=True):
         corr_histogram(I, output_prefix, title, mask, fig=fig, ax1=ax1, ax2=ax2)
 
 def displayCorrelation(correlation_map, filepath_prefix, on_grid=True):
+    plt = _pyplot()
     title = "Correlation"
     if on_grid:
             fig = plt.figure()
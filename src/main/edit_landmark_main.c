@@ -43,6 +43,11 @@ void  show_usage_and_exit()
     printf("  Optional arguments:\n");
     printf("    -scale   <double> - scale for RESCALE operation\n");
     printf("    -roi   <left> <top> <width> <height> - roi for crop and subset operations\n");
+    printf("    -ops   <filename> - batch script, one operation per line, each applied to the\n");
+    printf("           input landmark. Replaces -output/-operation. Line formats:\n");
+    printf("               CROP <left> <top> <width> <height> <output>\n");
+    printf("               SUBSET <left> <top> <width> <height> <output>\n");
+    printf("               RESCALE <scale> <output>\n");
     exit(EXIT_FAILURE);
 }
 
@@ -51,6 +56,7 @@ int32_t main (int32_t argc, char **argv)
     char *infile=NULL;
     char *outfile=NULL;
     char *operation=NULL;
+    char *opsfile=NULL;
     double scale=1.0;
     int32_t roi_left = -1;
     int32_t roi_top = -1;
@@ -67,6 +73,7 @@ int32_t main (int32_t argc, char **argv)
         if ((m_getarg(argv, "-input", &infile,  CFO_STRING) == 1) ||
             (m_getarg(argv, "-output", &outfile,  CFO_STRING) == 1) ||
             (m_getarg(argv, "-operation", &operation, CFO_STRING) == 1) ||
+            (m_getarg(argv, "-ops", &opsfile, CFO_STRING) == 1) ||
             (m_getarg(argv, "-scale", &scale, CFO_DOUBLE) == 1))
         {
             argv+=2;
@@ -88,17 +95,69 @@ int32_t main (int32_t argc, char **argv)
     }
     
     // Required arguments
-    if(infile==NULL | outfile==NULL | operation==NULL){
+    if(infile==NULL | (opsfile==NULL && (outfile==NULL | operation==NULL))){
         show_usage_and_exit();
     }
-    
+
     LMK lmk = {0};
     LMK lmk_out = {0};
     if(!Read_LMK(infile, &lmk)){
         SAFE_PRINTF(256, "Failed to read landmark file: %s\n", infile);
         return EXIT_FAILURE;
     }
-    
+
+    if(opsfile != NULL){
+        // Batch mode: the input landmark is parsed once and every scripted
+        // operation runs against it in this process, instead of paying one
+        // fork/exec and landmark parse per operation
+        FILE *ops_fp = fopen(opsfile, "r");
+        if(ops_fp == NULL){
+            SAFE_PRINTF(256, "Failed to open ops file: %s\n", opsfile);
+            free_lmk(&lmk);
+            return EXIT_FAILURE;
+        }
+
+        bool batch_success = true;
+        char line[1024];
+        while(batch_success && fgets(line, sizeof(line), ops_fp) != NULL){
+            char op[16] = {0};
+            char op_outfile[512] = {0};
+            double op_scale = 1.0;
+            int32_t op_left, op_top, op_width, op_height;
+            if(sscanf(line, "%15s", op) != 1){
+                // Blank line
+                continue;
+            }
+
+            LMK op_out = {0};
+            if(strncmp(op, "RESCALE", 8)==0 &&
+               sscanf(line, "%*s %lf %511s", &op_scale, op_outfile) == 2){
+                batch_success &= ResampleLMK(&lmk, &op_out, op_scale);
+            }else if(strncmp(op, "CROP", 5)==0 &&
+                     sscanf(line, "%*s %d %d %d %d %511s", &op_left, &op_top, &op_width, &op_height, op_outfile) == 5){
+                batch_success &= Crop_IntepolateLMK(&lmk, &op_out, op_left, op_top, op_width, op_height);
+            }else if(strncmp(op, "SUBSET", 7)==0 &&
+                     sscanf(line, "%*s %d %d %d %d %511s", &op_left, &op_top, &op_width, &op_height, op_outfile) == 5){
+                batch_success &= SubsetLMK(&lmk, &op_out, op_left, op_top, op_width, op_height);
+            }else{
+                SAFE_PRINTF(1024, "Unrecognized batch operation: %s\n", line);
+                batch_success = false;
+            }
+
+            if(batch_success){
+                batch_success &= Write_LMK(op_outfile, &op_out);
+            }
+            if(batch_success){
+                SAFE_PRINTF(256, "Landmark file written to: %s\n", op_outfile);
+            }
+            free_lmk(&op_out);
+        }
+
+        fclose(ops_fp);
+        free_lmk(&lmk);
+        return batch_success ? EXIT_SUCCESS : EXIT_FAILURE;
+    }
+
     bool success = true;
     if(strncmp(operation, "RESCALE", strlen(operation))==0){
         if(scale == 1.0){
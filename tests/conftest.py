@@ -0,0 +1,239 @@
+import os
+from pathlib import Path
+
+import pytest
+
+## Every test writes exclusively under tmp_path and the build/* binaries are
+#  independent processes, so the suite parallelizes cleanly with
+#  `pytest -n auto` (pytest-xdist). Cap "auto" at half the cores so the
+#  C binaries the tests shell out to are not oversubscribed when they
+#  multithread internally.
+os.environ.setdefault(
+    "PYTEST_XDIST_AUTO_NUM_WORKERS", str(max(1, (os.cpu_count() or 2) // 2))
+)
+
+## Pin the BLAS pools of the test processes themselves to one thread, so the
+#  array comparisons inside each xdist worker don't multiply into
+#  workers * threads oversubscription. Must be set before numpy is imported,
+#  which the imports below pull in.
+os.environ.setdefault("OMP_NUM_THREADS", "1")
+os.environ.setdefault("OPENBLAS_NUM_THREADS", "1")
+os.environ.setdefault("MKL_NUM_THREADS", "1")
+
+from test_helpers import run_cmd
+
+import landmark_tools.landmark as landmark
+
+# Path to the top-level repo directory
+TOP_DIR = Path(__file__).resolve().parent.parent
+TEST_DIR = Path(__file__).resolve().parent
+
+
+## Session-scoped gold-standard landmarks: each archival .lmk file is parsed
+#  once per pytest session instead of once per test function that asserts
+#  against it
+
+@pytest.fixture(scope="session")
+def gt_equal_rectangular():
+    return landmark.Landmark.load(TEST_DIR / "gold_standard_data/equal_rectangular_WY.lmk")
+
+
+@pytest.fixture(scope="session")
+def gt_utm():
+    return landmark.Landmark.load(TEST_DIR / "gold_standard_data/UTM_WY.lmk")
+
+
+@pytest.fixture(scope="session")
+def gt_polar_stereo():
+    return landmark.Landmark.load(TEST_DIR / "gold_standard_data/polarstereo_moon.lmk")
+
+
+@pytest.fixture(scope="session")
+def gt_utm_demo():
+    return landmark.Landmark.load(TEST_DIR / "gold_standard_data/UTM_WY.lmk_demo.lmk")
+
+
+@pytest.fixture(scope="session")
+def gt_haworth():
+    return landmark.Landmark.load(TEST_DIR / "gold_standard_data/Haworth_final_adj_5mpp_surf_tif_rendered.lmk")
+
+
+GEOGRAPHIC_CONFIG = \
+"""input:
+  filename: gold_standard_data/equal_rectangular_WY.raw
+  width_px: 1311
+  height_px: 938
+  bit_depth: 32
+  upper_left_x_projection_unit: -107.5081027
+  upper_left_y_projection_unit: 44.5936521
+  pixel_resolution_projection_unit : 0.000098783643545
+output:
+  filename: {}/equal_rectangular_WY.lmk
+  width_px: 500
+  height_px: 500
+  pixel_resolution_meters: 10
+  center_latitude: 44.55
+  center_longitude: -107.44
+"""
+
+UTM_CONFIG = \
+"""input:
+  filename: gold_standard_data/UTM_WY.raw
+  width_px: 1118
+  height_px: 1118
+  bit_depth: 32
+  upper_left_x_projection_unit: 300920.718
+  upper_left_y_projection_unit: 4940572.392
+  pixel_resolution_projection_unit : 8.944543828264759
+  latitude_standard_parallel : 0
+  longitude_natural_origin : -105
+output:
+  filename: {}/UTM_WY.lmk
+  width_px: 500
+  height_px: 500
+  pixel_resolution_meters: 10
+  center_latitude: 44.55
+  center_longitude: -107.44
+"""
+
+POLAR_STEREO_CONFIG = \
+"""input :
+  filename : gold_standard_data/polarstereo_moon.raw
+  width_px : 1000
+  height_px : 1000
+  bit_depth : 32
+  upper_left_x_projection_unit : -19000.000
+  upper_left_y_projection_unit : -4000.000
+  pixel_resolution_projection_unit : 16
+  latitude_standard_parallel : -90.0
+  longitude_natural_origin : 0.0
+output :
+  filename : {}/polarstereo_moon.lmk
+  width_px : 500
+  height_px : 500
+  pixel_resolution_meters : 20
+  center_latitude : -89.480003
+  center_longitude : 215.199997
+"""
+
+## One entry per projection; the legacy-config and geotiff entry points are
+#  exercised against the same archival landmark
+CASES = {
+    "geographic": {
+        "config": GEOGRAPHIC_CONFIG,
+        "config_name": "make_geographic_lmk.txt",
+        "output_name": "equal_rectangular_WY.lmk",
+        "gt_fixture": "gt_equal_rectangular",
+        "legacy_args": ["-projection", "GEOGRAPHIC",
+                        "-planet", "Earth",
+                        "-nodata_value", "-999999"],
+        "geotif": "gold_standard_data/equal_rectangular_WY.tif",
+        "geotif_args": ["-lmk_width_meters", "5000",
+                        "-lmk_height_meters", "5000",
+                        "-lmk_res", "10",
+                        "-lmk_center_lat", "44.55",
+                        "-lmk_center_long", "-107.44",
+                        "-planet", "Earth"],
+    },
+    "utm": {
+        "config": UTM_CONFIG,
+        "config_name": "make_utm_lmk.txt",
+        "output_name": "UTM_WY.lmk",
+        "gt_fixture": "gt_utm",
+        "legacy_args": ["-projection", "UTM",
+                        "-planet", "Earth",
+                        "-nodata_value", "-999999"],
+        "geotif": "gold_standard_data/UTM_WY.tif",
+        "geotif_args": ["-lmk_width_meters", "5000",
+                        "-lmk_height_meters", "5000",
+                        "-lmk_res", "10",
+                        "-lmk_center_lat", "44.55",
+                        "-lmk_center_long", "-107.44",
+                        "-planet", "Earth"],
+    },
+    "stereo": {
+        "config": POLAR_STEREO_CONFIG,
+        "config_name": "make_polar_stereo_lmk.txt",
+        "output_name": "polarstereo_moon.lmk",
+        "gt_fixture": "gt_polar_stereo",
+        "legacy_args": ["-projection", "STEREO",
+                        "-planet", "Moon"],
+        "geotif": "gold_standard_data/polarstereo_moon.tif",
+        "geotif_args": ["-lmk_width_meters", "10000",
+                        "-lmk_height_meters", "10000",
+                        "-lmk_res", "20",
+                        "-lmk_center_lat", "-89.480003",
+                        "-lmk_center_long", "215.199997",
+                        "-planet", "Moon"],
+    },
+}
+
+
+@pytest.fixture(scope="session", params=list(CASES))
+def legacy_landmark(request, tmp_path_factory):
+    """Run create_landmark once per projection from a legacy configuration file.
+
+    Session scope caches the subprocess output, so every assertion against the
+    same projection shares one build instead of respawning the binary.
+    """
+    case = CASES[request.param]
+    tmp_path = tmp_path_factory.mktemp("legacy_{}".format(request.param))
+    config_path = tmp_path / case["config_name"]
+    with open(config_path, 'w') as fp:
+        fp.write(case["config"].format(tmp_path))
+
+    run_cmd([TOP_DIR / "build/create_landmark",
+             *case["legacy_args"],
+             "-config_file", config_path],
+             cwd= TEST_DIR)
+
+    return tmp_path / case["output_name"], case["gt_fixture"]
+
+
+@pytest.fixture(scope="session", params=list(CASES))
+def geotiff_landmark(request, tmp_path_factory):
+    """Run create_landmark once per projection from geotiff metadata.
+
+    Session scope caches the subprocess output, so every assertion against the
+    same projection shares one build instead of respawning the binary.
+    """
+    case = CASES[request.param]
+    tmp_path = tmp_path_factory.mktemp("geotiff_{}".format(request.param))
+    output = tmp_path / case["output_name"]
+
+    run_cmd([TOP_DIR / "build/create_landmark",
+             "-geotif_file", TEST_DIR / case["geotif"],
+             "-lmk_file", output,
+             *case["geotif_args"]],
+             cwd= TEST_DIR)
+
+    return output, case["gt_fixture"]
+
+
+## Session-scoped PLY conversions: each landmark_2_point run is cached for the
+#  session so reruns of the consuming tests reuse the converted point cloud
+
+@pytest.fixture(scope="session")
+def utm_wy_ply(tmp_path_factory):
+    """Convert the UTM_WY gold landmark to a LOCAL-frame PLY once per session."""
+    ply_path = tmp_path_factory.mktemp("ply_utm_wy") / "UTM_WY.ply"
+    run_cmd([TOP_DIR / "build/landmark_2_point",
+             "-landmark", TEST_DIR / "gold_standard_data/UTM_WY.lmk",
+             "-ply", ply_path,
+             "-frame", "LOCAL",
+             "-filetype", "PLY_BIG_ENDIAN"],
+             cwd= TEST_DIR)
+    return ply_path
+
+
+@pytest.fixture(scope="session")
+def haworth_ply(tmp_path_factory):
+    """Convert the Haworth gold landmark to a WORLD-frame PLY once per session."""
+    ply_path = tmp_path_factory.mktemp("ply_haworth") / "pointcloud.ply"
+    run_cmd([TOP_DIR / "build/landmark_2_point",
+             "-landmark", TEST_DIR / "gold_standard_data/Haworth_final_adj_5mpp_surf_tif_rendered.lmk",
+             "-ply", ply_path,
+             "-frame", "WORLD",
+             "-filetype", "PLY_BIG_ENDIAN"],
+             cwd= TEST_DIR)
+    return ply_path
@@ -8,7 +8,7 @@ TOP_DIR = Path(__file__).resolve().parent.parent
 TEST_DIR = Path(__file__).resolve().parent
 import landmark_tools.landmark as landmark
 
-def test_translate(tmp_path):
+def test_translate(tmp_path, gt_haworth):
     """Apply (x, y, z) translation to a DEM, then apply the inverse (-x, -y, -z); result should match the original DEM.
     """
     x = 20 
@@ -31,13 +31,13 @@ def test_translate(tmp_path):
 
     L1 = landmark.Landmark(test1_path)
     L2 = landmark.Landmark(test2_path)
-    gt = landmark.Landmark(TEST_DIR / "gold_standard_data/Haworth_final_adj_5mpp_surf_tif_rendered.lmk")
+    gt = gt_haworth
 
     # Check changes
     assert not L1 == L2
     assert L2 == gt
 
-def test_rotate(tmp_path):
+def test_rotate(tmp_path, gt_haworth):
     """Apply rotation to a DEM, then apply the inverse rotation; result should match the original DEM.
     """
     rotate = 15
@@ -58,7 +58,7 @@ def test_rotate(tmp_path):
 
     L1 = landmark.Landmark(test1_path)
     L2 = landmark.Landmark(test2_path)
-    gt = landmark.Landmark(TEST_DIR / "gold_standard_data/Haworth_final_adj_5mpp_surf_tif_rendered.lmk")
+    gt = gt_haworth
 
     # Check changes
     assert not L1 == L2
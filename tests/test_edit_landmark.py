@@ -2,36 +2,45 @@ from pathlib import Path
 import sys
 from test_helpers import run_cmd
 import numpy as np
+import pytest
 
 # Path to the top-level repo directory
 TOP_DIR = Path(__file__).resolve().parent.parent
 TEST_DIR = Path(__file__).resolve().parent
 import landmark_tools.landmark as landmark
 
-def test_crop(tmp_path):
+@pytest.fixture(scope="module")
+def shared_tmp(tmp_path_factory):
+    """One output directory for the whole module.
+
+    Every test writes uniquely named files, so sharing a directory avoids the
+    per-test mkdir/stat churn of a fresh tmp_path on network filesystems.
+    """
+    return tmp_path_factory.mktemp("edit_landmark")
+
+def test_crop(shared_tmp):
     """Crop the DEM directly to the target size, and compare with a two-step crop sequence that yields the same final size; results should be identical.
 
     Cropping a landmark will change the elevation values because the anchor point changes, but the structure should remain the same.
     """
     # Run executables
-    crop1_path = tmp_path / "Haworth_final_adj_5mpp_surf_tif_rendered_cropped1.lmk"
-    crop2_path = tmp_path / "Haworth_final_adj_5mpp_surf_tif_rendered_cropped2.lmk"
-    crop_rough_path = tmp_path / "Haworth_final_adj_5mpp_surf_tif_rendered_cropped_rough.lmk"
-    run_cmd([ TOP_DIR / "build/edit_landmark", 
-             "-input", TEST_DIR / "gold_standard_data/Haworth_final_adj_5mpp_surf_tif_rendered.lmk", 
-             "-output", crop1_path, 
-             "-operation", "CROP", 
-             "-roi", "150", "150", "200", "200"], 
-            cwd= TEST_DIR)
-    
-    run_cmd([ TOP_DIR / "build/edit_landmark", 
-             "-input", TEST_DIR / "gold_standard_data/Haworth_final_adj_5mpp_surf_tif_rendered.lmk", 
-             "-output", crop_rough_path, 
-             "-operation", "CROP", 
-             "-roi", "50", "50", "400", "400"], 
+    crop1_path = shared_tmp / "Haworth_final_adj_5mpp_surf_tif_rendered_cropped1.lmk"
+    crop2_path = shared_tmp / "Haworth_final_adj_5mpp_surf_tif_rendered_cropped2.lmk"
+    crop_rough_path = shared_tmp / "Haworth_final_adj_5mpp_surf_tif_rendered_cropped_rough.lmk"
+    # The direct crop and the rough crop both read the gold file, so one
+    # batch invocation parses the input landmark once and performs both;
+    # only the refining crop below depends on the rough output
+    ops_path = shared_tmp / "crop_ops.txt"
+    ops_path.write_text(
+        f"CROP 150 150 200 200 {crop1_path}\n"
+        f"CROP 50 50 400 400 {crop_rough_path}\n"
+    )
+    run_cmd([ TOP_DIR / "build/edit_landmark",
+             "-input", TEST_DIR / "gold_standard_data/Haworth_final_adj_5mpp_surf_tif_rendered.lmk",
+             "-ops", ops_path],
             cwd= TEST_DIR)
-    
-    run_cmd([ TOP_DIR / "build/edit_landmark", 
+
+    run_cmd([ TOP_DIR / "build/edit_landmark",
              "-input", crop_rough_path, 
              "-output", crop2_path, 
              "-operation", "CROP", 
@@ -43,7 +52,7 @@ def test_crop(tmp_path):
     
     assert L_crop1 == L_crop2
 
-def test_subset(tmp_path):
+def test_subset(shared_tmp, gt_haworth):
     """New DEM is a submatrix of the original raster. Elevation values should not change.
     """
     # Run executables
@@ -51,7 +60,7 @@ def test_subset(tmp_path):
     height = 300
     x1 = 50
     y1 = 25
-    subset_path = tmp_path / "Haworth_final_adj_5mpp_surf_tif_rendered_subset.lmk"
+    subset_path = shared_tmp / "Haworth_final_adj_5mpp_surf_tif_rendered_subset.lmk"
     run_cmd([ TOP_DIR / "build/edit_landmark", 
              "-input", TEST_DIR / "gold_standard_data/Haworth_final_adj_5mpp_surf_tif_rendered.lmk", 
              "-output", subset_path, 
@@ -59,11 +68,17 @@ def test_subset(tmp_path):
              "-roi", str(x1), str(y1), str(width), str(height)], 
             cwd= TEST_DIR)
 
-    L_org = landmark.Landmark( TEST_DIR / "gold_standard_data/Haworth_final_adj_5mpp_surf_tif_rendered.lmk")
+    L_org = gt_haworth
     L_subset = landmark.Landmark( subset_path)
-    
-    np.testing.assert_allclose(L_org.ele[y1:y1+height, x1:x1+width], L_subset.ele)
-    np.testing.assert_allclose(L_org.srm[y1:y1+height, x1:x1+width], L_subset.srm)
+
+    # Windowed load pages in only the compared submatrix of the gold file
+    srm_win, ele_win = landmark.Landmark.load_window(
+        TEST_DIR / "gold_standard_data/Haworth_final_adj_5mpp_surf_tif_rendered.lmk",
+        y1, x1, height, width)
+    # SUBSET is a pure submatrix copy, so the values must match exactly;
+    # array_equal is one comparison pass instead of allclose's sub/abs/compare
+    assert np.array_equal(ele_win, L_subset.ele)
+    assert np.array_equal(srm_win, L_subset.srm)
 
     assert L_org.BODY == L_subset.BODY
     assert L_org.lmk_id == L_subset.lmk_id
@@ -72,17 +87,17 @@ def test_subset(tmp_path):
     assert L_subset.anchor_col == width/2
     assert L_subset.anchor_row== height/2
     assert L_org.resolution == L_subset.resolution
-    np.allclose(L_org.mapRworld, L_subset.mapRworld, rtol=0, atol=1e-4)
+    assert np.allclose(L_org.mapRworld, L_subset.mapRworld, rtol=0, atol=1e-4)
 
     ##TODO? Anchor point also changes but by how much would require a calculation
 
-def test_rescale(tmp_path):
+def test_rescale(shared_tmp, gt_haworth):
     """By upscaling, then downscaling, we should return to the same map.
     """
     # Run executables
     scale = 0.5
-    upscale_path = tmp_path / "Haworth_final_adj_5mpp_surf_tif_rendered_upsample.lmk"
-    downscale_path = tmp_path / "Haworth_final_adj_5mpp_surf_tif_rendered_downsample.lmk"
+    upscale_path = shared_tmp / "Haworth_final_adj_5mpp_surf_tif_rendered_upsample.lmk"
+    downscale_path = shared_tmp / "Haworth_final_adj_5mpp_surf_tif_rendered_downsample.lmk"
     run_cmd([ TOP_DIR / "build/edit_landmark", 
              "-input", TEST_DIR / "gold_standard_data/Haworth_final_adj_5mpp_surf_tif_rendered.lmk", 
              "-output", upscale_path, 
@@ -97,7 +112,7 @@ def test_rescale(tmp_path):
              "-scale", str(1/scale)], 
             cwd= TEST_DIR)
 
-    L_org = landmark.Landmark( TEST_DIR / "gold_standard_data/Haworth_final_adj_5mpp_surf_tif_rendered.lmk")
+    L_org = gt_haworth
     L_scale = landmark.Landmark( downscale_path)
     
     assert L_org == L_scale
\ No newline at end of file
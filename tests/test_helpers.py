@@ -1,7 +1,31 @@
+import os
 import subprocess
 
+import numpy as np
+
 def run_cmd(cmd, cwd):
-    result = subprocess.run(cmd, cwd=cwd, capture_output=True, text=True)
-    print(result.stdout)
-    assert result.returncode == 0, f"Command failed: {result.stderr}"
-    return result.stdout
\ No newline at end of file
+    # Pin the child's OpenMP thread count so that binaries which multithread
+    # internally don't oversubscribe the host when several run at once under
+    # xdist. Override via LMK_OMP_THREADS, e.g. nproc / worker count, to hand
+    # each binary a larger budget.
+    env = os.environ.copy()
+    env["OMP_NUM_THREADS"] = os.environ.get("LMK_OMP_THREADS", "1")
+    # Successful runs only ever printed their log, so stdout goes straight to
+    # the null device instead of being drained through a pipe and decoded;
+    # stderr is kept as bytes and decoded only when the command fails
+    result = subprocess.run(cmd, cwd=cwd, env=env,
+                            stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+    assert result.returncode == 0, \
+        f"Command failed: {result.stderr.decode(errors='replace')}"
+
+def finite_mask(I1, I2=None):
+    """Boolean mask of the elements that are finite in I1 (and I2, when given).
+
+    Equivalent to ~(isnan(I1) | isnan(I2)) but reuses the first mask as the
+    accumulator, so large rasters make two fused passes instead of allocating
+    four boolean temporaries.
+    """
+    mask = np.isfinite(I1)
+    if I2 is not None:
+        np.logical_and(mask, np.isfinite(I2), out=mask)
+    return mask
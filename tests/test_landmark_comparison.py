@@ -1,6 +1,6 @@
 from pathlib import Path
 import sys
-from test_helpers import run_cmd
+from test_helpers import finite_mask, run_cmd
 import numpy as np
 
 # Path to the top-level repo directory
@@ -28,17 +28,19 @@ def test_landmark_comparison_regression(tmp_path):
     width = 500
     height = 500
 
-    displacement_maps1 = visualize_corr.loadAllDisplacementMatrices(filepath1, width, height, save_image=False)
-    displacement_maps2 = visualize_corr.loadAllDisplacementMatrices(filepath2, width, height, save_image=False)
+    displacement_maps1 = visualize_corr.loadAllDisplacementMatrices(filepath1, width, height, use_mmap=True)
+    displacement_maps2 = visualize_corr.loadAllDisplacementMatrices(filepath2, width, height, use_mmap=True)
 
     # Check changes
-    for key,I1 in displacement_maps1.items():
-        I2 = displacement_maps2[key]
-        mask = np.logical_not(np.logical_or(np.isnan(I1), np.isnan(I2)))
-        if(key != "correlation"):
-            np.testing.assert_allclose(I1[mask], I2[mask], rtol=0, atol=1)
-        else:
-            np.testing.assert_allclose(I1[mask], I2[mask])
+    # The displacement keys share one tolerance and are checked in one
+    # stacked pass; correlation keeps its exact relative tolerance
+    assert sorted(displacement_maps1) == sorted(displacement_maps2)
+    visualize_corr.assert_maps_close(
+        displacement_maps1, displacement_maps2, 1, keys=["dx", "dy", "dz"])
+    I1 = displacement_maps1["correlation"]
+    I2 = displacement_maps2["correlation"]
+    mask = finite_mask(I1, I2)
+    np.testing.assert_allclose(I1[mask], I2[mask])
 
 
 def test_landmark_comparison_self(tmp_path):
@@ -59,13 +61,13 @@ def test_landmark_comparison_self(tmp_path):
     width = 1000
     height = 1000
 
-    displacement_maps1 = visualize_corr.loadAllDisplacementMatrices(filepath1, width, height, save_image=False)
+    displacement_maps1 = visualize_corr.loadAllDisplacementMatrices(filepath1, width, height, save_image=False, use_mmap=True)
 
     # Check changes
     for key,I1 in displacement_maps1.items():
         if(key != "correlation"):
             # Displacement should be low
-            np.testing.assert_allclose(I1[np.logical_not(np.isnan(I1))], 0, rtol=0, atol=5)
+            np.testing.assert_allclose(I1[finite_mask(I1)], 0, rtol=0, atol=5)
         else:
             # Correlation should be high
-            assert np.all(I1[np.logical_not(np.isnan(I1))] > 0.7), "Not all elements are greater than 0.7"
+            assert np.all(I1[finite_mask(I1)] > 0.7), "Not all elements are greater than 0.7"
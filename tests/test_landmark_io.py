@@ -0,0 +1,72 @@
+from pathlib import Path
+import sys
+import numpy as np
+
+# Path to the top-level repo directory
+TOP_DIR = Path(__file__).resolve().parent.parent
+TEST_DIR = Path(__file__).resolve().parent
+import landmark_tools.landmark as landmark
+
+def test_unpack_matrix_big_endian():
+    """Round trip a big endian buffer through unpack_matrix.
+    """
+    mat = np.arange(12, dtype=np.float32).reshape(3, 4)
+    unpacked = landmark.unpack_matrix('f', [4, 3], mat.astype('>f4').tobytes())
+    assert np.array_equal(unpacked, mat)
+
+def test_unpack_matrix_little_endian():
+    """unpack_matrix used to hard-code big endian parsing in its unpack loop,
+    silently ignoring little_endian=True and corrupting legacy reads.
+    """
+    mat = np.arange(12, dtype=np.float32).reshape(3, 4)
+    unpacked = landmark.unpack_matrix('f', [4, 3], mat.astype('<f4').tobytes(), little_endian=True)
+    assert np.array_equal(unpacked, mat)
+
+def make_test_landmark(rows=5, cols=7):
+    """Build a small synthetic landmark without reading a file."""
+    rng = np.random.default_rng(3)
+    L = landmark.Landmark.__new__(landmark.Landmark)
+    L.lmk_id = b'test_landmark'.ljust(32, b'0')
+    L.BODY = 1
+    L.num_cols = cols
+    L.num_rows = rows
+    L.num_pixels = rows*cols
+    L.anchor_col = cols/2
+    L.anchor_row = rows/2
+    L.resolution = 5.0
+    L.anchor_point = rng.normal(size=3)*1000
+    L.mapRworld = rng.normal(size=(3, 3))
+    L.srm = rng.integers(0, 255, size=(rows, cols)).astype(np.uint8)
+    L.ele = rng.normal(size=(rows, cols)).astype(np.float32)
+    return L
+
+def test_bytes_round_trip():
+    """from_bytes(to_bytes()) should reproduce the landmark without disk I/O.
+    """
+    L = make_test_landmark()
+    data = L.to_bytes()
+    L2 = landmark.Landmark.from_bytes(data)
+    assert L == L2
+    assert L2.to_bytes() == data
+
+def test_file_round_trip(tmp_path):
+    """save followed by a file load should reproduce the landmark.
+    """
+    L = make_test_landmark()
+    lmk_path = tmp_path / "round_trip.lmk"
+    L.save(lmk_path)
+    L2 = landmark.Landmark(lmk_path)
+    assert L == L2
+    assert L2.to_bytes() == L.to_bytes()
+
+def test_pack_unpack_round_trip():
+    """pack_matrix and unpack_matrix should invert each other for both byte orders.
+    """
+    rng = np.random.default_rng(0)
+    for type, dtype in [('d', np.float64), ('f', np.float32), ('B', np.uint8)]:
+        mat = (rng.random((5, 7)) * 250).astype(dtype)
+        for little_endian in [False, True]:
+            buffer = bytearray(mat.nbytes)
+            landmark.pack_matrix(type, mat, buffer, little_endian=little_endian)
+            unpacked = landmark.unpack_matrix(type, [7, 5], buffer, little_endian=little_endian)
+            assert np.array_equal(unpacked, mat)
@@ -8,7 +8,7 @@ TOP_DIR = Path(__file__).resolve().parent.parent
 TEST_DIR = Path(__file__).resolve().parent
 import landmark_tools.landmark as landmark
 
-def test_landmark_registration(tmp_path):
+def test_landmark_registration(tmp_path, gt_haworth):
     """Apply a translation to the DEM, then reregister it; the result should match the original DEM if registration is correct.
  
     """
@@ -31,7 +31,7 @@ def test_landmark_registration(tmp_path):
 
     L1 = landmark.Landmark(translate_path)
     L2 = landmark.Landmark(translate_registered_path)
-    gt = landmark.Landmark(TEST_DIR / "gold_standard_data/Haworth_final_adj_5mpp_surf_tif_rendered.lmk")
+    gt = gt_haworth
 
     assert L1 != gt
     assert gt == L2